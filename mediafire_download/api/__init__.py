@@ -1,12 +1,25 @@
 from .api import Mediafire
 from .containers import DownloadParams, FileInfo
-from .defs import DOWNLOAD_MODE_DEFAULT, DOWNLOAD_MODES, SITE_PRIMARY, DownloadMode, Mem, NumRange
+from .defs import (
+    CONNECT_DNS_CACHE_TTL_DEFAULT,
+    CONNECT_KEEPALIVE_TIMEOUT_DEFAULT,
+    CONNECT_LIMIT_TOTAL_DEFAULT,
+    DOWNLOAD_MODE_DEFAULT,
+    DOWNLOAD_MODES,
+    SITE_PRIMARY,
+    DownloadMode,
+    Mem,
+    NumRange,
+)
 from .exceptions import MediafireError
 from .filters import Filter
 from .options import MediafireOptions
 from .request_queue import RequestQueue
 
 __all__ = (
+    'CONNECT_DNS_CACHE_TTL_DEFAULT',
+    'CONNECT_KEEPALIVE_TIMEOUT_DEFAULT',
+    'CONNECT_LIMIT_TOTAL_DEFAULT',
     'DOWNLOAD_MODES',
     'DOWNLOAD_MODE_DEFAULT',
     'SITE_PRIMARY',
@@ -10,19 +10,20 @@ from __future__ import annotations
 
 import hashlib
 import json
+import math
 import pathlib
 import random
 import re
 import sys
 import warnings
-from asyncio import Semaphore, create_task, gather, sleep
-from collections.abc import Callable
-from gzip import BadGzipFile, GzipFile
-from inspect import get_annotations
-from io import BytesIO
-from typing import Literal, TypeAlias
-
-from aiofile import async_open
+import zlib
+from asyncio import Lock, Queue, Semaphore, Task, create_task, gather, shield, sleep, to_thread
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from html import unescape
+from typing import Any, Literal, TypeAlias
+
+from aiofile import AIOFile, async_open
 from aiohttp import (
     ClientConnectorError,
     ClientPayloadError,
@@ -34,7 +35,7 @@ from aiohttp import (
 from aiohttp_socks import ProxyConnector
 from bs4 import BeautifulSoup
 
-from mediafire_download.util import UAManager, compose_link_v15
+from mediafire_download.util import UAManager, compose_link_v15, regular_file_size
 
 from .containers import (
     APIFileInfoResponse,
@@ -46,24 +47,58 @@ from .containers import (
     FileInfo,
     FilePathMapping,
     FileSystemMapping,
+    FolderContent,
     FolderInfo,
     ParsedUrl,
 )
-from .defs import API_VERSION, CONNECT_RETRY_DELAY, SITE_API, SITE_TAG, UTF8, DownloadMode, Mem
+from .defs import (
+    API_FOLDER_CACHE_SIZE,
+    API_VERSION,
+    CONNECT_DNS_CACHE_TTL_DEFAULT,
+    CONNECT_KEEPALIVE_TIMEOUT_DEFAULT,
+    CONNECT_LIMIT_TOTAL_DEFAULT,
+    CONNECT_RETRY_DELAY,
+    DOWNLOAD_CHUNK_SIZE,
+    INTERSTITIAL_READ_LIMIT,
+    SITE_API,
+    SITE_TAG,
+    UTF8,
+    DownloadMode,
+    Mem,
+)
 from .exceptions import MediafireErrorCodes, RequestError, ValidationError
 from .filters import Filter, any_filter_matching
 from .logging import Log, set_logger
 from .options import MediafireOptions
 from .request_queue import RequestQueue
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads: Callable[[bytes | str], Any] = orjson.loads if orjson else json.loads
+
 __all__ = ('Mediafire',)
 
 CLIENT_CONNECTOR_ERRORS = (ClientPayloadError, ClientConnectorError)
 
 APIContentTypes: TypeAlias = Literal['files', 'folder', 'folders']
 
+DOWNLOAD_PARAMS_KEYS = frozenset(DownloadParams._fields)
+
 re_mediafire_file = re.compile(r'\W(\w{14,})\W')
 re_mediafire_folder = re_mediafire_file
+re_mediafire_url = re.compile(r'^.*?/(folder|file|file_premium)/([^/\s]+)/([^/\s]+)')
+re_download_url = re.compile(r'https://download\d+\..+')
+re_download_href = re.compile(rb'<a\s[^>]*?href=["\'](https://download\d+\.[^"\']+)["\']', re.IGNORECASE)
+
+FILE_INFO_INT_FIELDS = ('size', 'flag', 'revision')
+FOLDER_INFO_INT_FIELDS = ('file_count', 'folder_count', 'flag', 'revision')
+FOLDER_CONTENT_INT_FIELDS = ('chunk_size', 'chunk_number', 'revision')
+FILE_INFO_LITERAL_FIELDS = ('ready', 'privacy', 'password_protected')
+FOLDER_INFO_LITERAL_FIELDS = ('privacy', 'dropbox_enabled')
+FOLDER_CONTENT_LITERAL_FIELDS = ('content_type', 'more_chunks')
 
 
 class Mediafire:
@@ -76,10 +111,16 @@ class Mediafire:
         self._queue_size: int = 0
         self._queue_size_orig: int = 0
         self._parsed: ParsedUrl = ParsedUrl.default()
+        self._prompt_lock: Lock = Lock()
+        self._folder_cache: OrderedDict[tuple[APIContentTypes, str, bool, int], Task[APIResponse]] = OrderedDict()
         # options
         self._dest_base: pathlib.Path = options['dest_base']
         self._retries: int = options['retries']
         self._max_jobs = options['max_jobs']
+        self._connection_limit: int = options.get('connection_limit', CONNECT_LIMIT_TOTAL_DEFAULT)
+        self._connection_limit_per_host: int = options.get('connection_limit_per_host', self._max_jobs)
+        self._dns_cache_ttl: int = options.get('dns_cache_ttl', CONNECT_DNS_CACHE_TTL_DEFAULT)
+        self._keepalive_timeout: float = options.get('keepalive_timeout', CONNECT_KEEPALIVE_TIMEOUT_DEFAULT)
         self._timeout: ClientTimeout = options['timeout']
         self._nodelay: bool = options['nodelay']
         self._noconfirm: bool = options['noconfirm']
@@ -95,6 +136,8 @@ class Mediafire:
         assert next(reversed(self._dest_base.parents)).is_dir()
         assert isinstance(self._download_mode, DownloadMode)
         assert self._max_jobs > 0
+        # single limiter for all API requests, nested folder and chunk scans share it
+        self._api_semaphore: Semaphore = Semaphore(self._max_jobs)
 
     async def __aenter__(self) -> Mediafire:
         return self
@@ -103,13 +146,18 @@ class Mediafire:
         if self._session and not self._session.closed:
             await self._session.close()
 
+    @property
+    def prompt_lock(self) -> Lock:
+        """Held while waiting for user input, console readers must not touch stdin meanwhile"""
+        return self._prompt_lock
+
     @property
     def original_url(self):
         return compose_link_v15(self._parsed.folder_key, self._parsed.file_key, self._parsed.name)
 
     @staticmethod
     def _make_download_params(
-        num: int, num_orig: int, file_url: str, output_path: pathlib.Path, expected_size: int, file_hash: str,
+        num: int, num_orig: int, file_url: str, output_path: str, expected_size: int, file_hash: str,
     ) -> DownloadParams:
         return DownloadParams(num, num_orig, file_url, output_path, expected_size, file_hash)
 
@@ -123,24 +171,41 @@ class Mediafire:
         Log.warn('Aborting...')
         self._aborted = True
 
+    async def _confirm(self, prompt: str, default: bool) -> bool:
+        """Asks yes/no question until a valid answer is given, empty answer selects default"""
+        # one prompt at a time, concurrent downloads wait for their turn
+        async with self._prompt_lock:
+            while True:
+                ans = (await to_thread(input, prompt)).strip().lower()[:1]
+                if not ans:
+                    return default
+                if ans in 'y1':
+                    return True
+                if ans in 'n0':
+                    return False
+
     def _make_session(self) -> ClientSession:
         if self._session is not None and not self._session.closed:
             raise ValidationError('Called `make_session` with current session active!')
         use_proxy = bool(self._proxy)
+        connector_kwargs = {
+            'limit': self._connection_limit,
+            'limit_per_host': self._connection_limit_per_host,
+            'ttl_dns_cache': self._dns_cache_ttl,
+            'keepalive_timeout': self._keepalive_timeout,
+        }
         if use_proxy:
-            connector = ProxyConnector.from_url(self._proxy, limit=self._max_jobs)
+            connector = ProxyConnector.from_url(self._proxy, **connector_kwargs)
         else:
-            connector = TCPConnector(limit=self._max_jobs)
-        session = ClientSession(connector=connector, read_bufsize=Mem.MB, timeout=self._timeout)
+            connector = TCPConnector(**connector_kwargs)
+        session = ClientSession(connector=connector, read_bufsize=DOWNLOAD_CHUNK_SIZE, timeout=self._timeout)
         new_useragent = UAManager.select_useragent(self._proxy if use_proxy else None)
         Log.trace(f'[{"P" if use_proxy else "NP"}] Selected user-agent \'{new_useragent}\'...')
-        session.headers.update({'User-Agent': new_useragent, 'Content-Type': 'application/json'})
+        session.headers.update({'User-Agent': new_useragent, 'Content-Type': 'application/json', 'Accept-Encoding': 'gzip, deflate'})
         if self._extra_headers:
-            for hk, hv in self._extra_headers:
-                session.headers.update({hk: hv})
+            session.headers.update(dict(self._extra_headers))
         if self._extra_cookies:
-            for ck, cv in self._extra_cookies:
-                session.cookie_jar.update_cookies({ck: cv})
+            session.cookie_jar.update_cookies(dict(self._extra_cookies))
         return session
 
     async def _wrap_request(self, method: Literal['POST', 'GET'], url: str, **kwargs) -> ClientResponse:
@@ -159,9 +224,9 @@ class Mediafire:
             r: ClientResponse | None = None
             try:
                 Log.trace(f'Sending API request: GET => {endpoint}')
-                r = await self._wrap_request('GET', endpoint)
-
-                jresp: APIResponse | int = await r.json()
+                async with self._api_semaphore:
+                    r = await self._wrap_request('GET', endpoint)
+                    jresp: APIResponse | int = json_loads(await r.read())
 
                 if not isinstance(jresp, dict):
                     Log.fatal(f'Unknown API response: {jresp!r}')
@@ -169,7 +234,7 @@ class Mediafire:
                 elif jresp and 'error' in jresp:
                     raise RequestError(MediafireErrorCodes.ESESSIONTOKEN)
                 elif jresp and 'response' in jresp:
-                    return jresp
+                    return self._normalize_response(jresp)
                 else:
                     raise RequestError(MediafireErrorCodes.EUNK)
             except Exception as e:
@@ -199,31 +264,59 @@ class Mediafire:
             f'{SITE_API}/{API_VERSION}/folder/{content_selector}.php?r=utga&content_type={content_type}&filter=all&order_by=name'
             f'&order_direction=asc&chunk={chunk_num}&version={API_VERSION}&folder_key={folder_key}&response_format=json'
         )
-        return await self._query_api(endpoint)
+        # concurrent and repeated queries share the same request, least recently used entries are evicted
+        cache_key = (content_type, folder_key, get_content, chunk_num)
+        if (task := self._folder_cache.get(cache_key)) is None:
+            task = create_task(self._query_api(endpoint))
+            self._folder_cache[cache_key] = task
+            if len(self._folder_cache) > API_FOLDER_CACHE_SIZE:
+                self._folder_cache.popitem(last=False)
+        else:
+            self._folder_cache.move_to_end(cache_key)
+        try:
+            return await shield(task)
+        except Exception:
+            if self._folder_cache.get(cache_key) is task:
+                del self._folder_cache[cache_key]
+            raise
 
     async def _wrap_chunked_api_folder_query(
-        self, content_type: APIContentTypes, folder_key: str,
+        self, content_type: APIContentTypes, folder_key: str, items_count: int,
     ) -> APIFolderContentResponse:
-        results: APIFolderContentResponse | None = None
+        first_result = await self._query_folder_info(content_type, folder_key, True, 1)
+        first_response: APIFolderContentResponse = first_result['response']
+        content = first_response['folder_content']
+        items: list[FileInfo | FolderInfo] = list(content.get(content_type, []))
         chunk_num = 1
-        more_chunks = True
+        more_chunks = content.get('more_chunks', 'no') == 'yes'
         while more_chunks:
-            chunks_result = await self._query_folder_info(content_type, folder_key, True, chunk_num)
-            response: APIFolderContentResponse = chunks_result['response']
-            if results is not None:
-                results.update(**response)
-            else:
-                results = response
-            chunk_num += 1
-            more_chunks = response['folder_content'].get('more_chunks', 'no') == 'yes'
-        assert results
+            # expected items count allows to request all remaining chunks at once
+            chunk_size = content.get('chunk_size', 0)
+            items_left = items_count - len(items)
+            chunks_left = min(math.ceil(items_left / chunk_size), self._max_jobs) if chunk_size and items_left > 0 else 1
+            chunk_nums = range(chunk_num + 1, chunk_num + chunks_left + 1)
+            chunk_results: list[APIResponse] = await gather(*(
+                self._query_folder_info(content_type, folder_key, True, cnum) for cnum in chunk_nums
+            ))
+            # expected count may be off, chunks past the last one are ignored and a chunk without content ends the listing
+            for chunk_result in chunk_results:
+                content = chunk_result['response'].get('folder_content', {})
+                items.extend(content.get(content_type, []))
+                more_chunks = content.get('more_chunks', 'no') == 'yes'
+                if not more_chunks:
+                    break
+            chunk_num = chunk_nums[-1]
+        results: APIFolderContentResponse = {
+            **first_response,
+            'folder_content': {**first_response['folder_content'], content_type: items, 'more_chunks': 'no'},
+        }
         return results
 
-    async def _get_folder_folders(self, folder_key: str) -> APIFolderContentResponse:
-        return await self._wrap_chunked_api_folder_query('folders', folder_key)
+    async def _get_folder_folders(self, folder_key: str, folder_count: int) -> APIFolderContentResponse:
+        return await self._wrap_chunked_api_folder_query('folders', folder_key, folder_count)
 
-    async def _get_folder_files(self, folder_key: str) -> APIFolderContentResponse:
-        return await self._wrap_chunked_api_folder_query('files', folder_key)
+    async def _get_folder_files(self, folder_key: str, file_count: int) -> APIFolderContentResponse:
+        return await self._wrap_chunked_api_folder_query('files', folder_key, file_count)
 
     async def _get_folder_info(self, folder_key: str) -> APIFolderInfoResponse:
         api_response = await self._query_folder_info('folder', folder_key, False, 1)
@@ -237,21 +330,24 @@ class Mediafire:
     def _parse_file(self, links_file: pathlib.Path) -> list[DownloadParams]:
         assert links_file.is_file(), f'File \'{links_file}\' not found!'
 
-        with open(links_file, 'rt', encoding=UTF8) as infile:
-            json_ = json.load(infile)
+        links_bytes = links_file.read_bytes()
+        json_ = json_loads(links_bytes)
 
         download_param_list: list[DownloadParams] = []
         for _, fdata_or_str in json_.items():
-            if isinstance(fdata_or_str, list) and fdata_or_str[0].keys() == get_annotations(DownloadParams).keys():
-                file_datas: list[DownloadParams] = fdata_or_str
-                download_param_list.extend(self._make_download_params(
-                    file_data.num,
-                    file_data.num_orig,
-                    file_data.file_url,
-                    self._dest_base / file_data.output_path,
-                    file_data.expected_size,
-                    file_data.file_hash,
-                ) for file_data in file_datas)
+            if not isinstance(fdata_or_str, list) or not fdata_or_str:
+                continue
+            # keys are only checked for the first entry of each list
+            fdata_first = fdata_or_str[0]
+            if isinstance(fdata_first, dict) and fdata_first.keys() == DOWNLOAD_PARAMS_KEYS:
+                file_datas = [DownloadParams(**file_data) for file_data in fdata_or_str]
+            elif isinstance(fdata_first, list) and len(fdata_first) == len(DOWNLOAD_PARAMS_KEYS):
+                file_datas = [DownloadParams._make(file_data) for file_data in fdata_or_str]
+            else:
+                continue
+            download_param_list.extend(
+                file_data._replace(output_path=(self._dest_base / file_data.output_path).as_posix()) for file_data in file_datas
+            )
         return download_param_list
 
     async def download_from_file(self, links_file: pathlib.Path) -> tuple[pathlib.Path, ...]:
@@ -263,28 +359,49 @@ class Mediafire:
         """
         warnings.warn('Entry point \'download_from_file\' is unreliable and should not be used', DeprecationWarning)
 
-        async def proc_download_params(dparams: DownloadParams) -> pathlib.Path:
-            self._before_download(dparams)
-            return await self._download(dparams)
-
         donwload_param_list = self._parse_file(links_file)
         Log.info(f'Parsed {links_file.name}: found {len(donwload_param_list):d} files')
 
-        tasks = []
-        for download_params in donwload_param_list:
-            if self._aborted:
-                return ()
-            tasks.append(proc_download_params(download_params))
-
-        results: tuple[pathlib.Path | BaseException, ...] = await gather(*tasks)
-        Log.info(f'Downloaded {len([c for c in results if isinstance(c, pathlib.Path)])} / {len(tasks)} files')
-        return results
+        return await self._download_all(donwload_param_list)
+
+    async def _download_all(self, download_params_iter: Iterable[DownloadParams]) -> tuple[pathlib.Path, ...]:
+        """Downloads files using a fixed pool of `max_jobs` workers fed from a bounded queue"""
+        async def download_worker() -> None:
+            while (queue_item := await queue.get()) is not None:
+                index, download_params = queue_item
+                self._before_download(download_params)
+                try:
+                    results[index] = await self._download(download_params)
+                except Exception:
+                    Log.error(f'{download_params.output_path.rpartition("/")[2]}: {sys.exc_info()[0]}: {sys.exc_info()[1]}')
+
+        queue: Queue[tuple[int, DownloadParams] | None] = Queue(maxsize=self._max_jobs * 4)
+        results: dict[int, pathlib.Path] = {}
+        workers = [create_task(download_worker()) for _ in range(self._max_jobs)]
+        enqueued_count = 0
+        try:
+            for download_params in download_params_iter:
+                if self._aborted:
+                    break
+                await queue.put((enqueued_count, download_params))
+                enqueued_count += 1
+            for _ in workers:
+                await queue.put(None)
+            await gather(*workers)
+        finally:
+            # producer failure or cancellation must not leave workers running after we return
+            for worker in workers:
+                worker.cancel()
+            await gather(*workers, return_exceptions=True)
+
+        Log.info(f'Downloaded {len(results):d} / {enqueued_count:d} files')
+        return tuple(results[i] for i in sorted(results))
 
     async def _download_folder(self) -> tuple[pathlib.Path, ...]:
         action_response: APIFolderInfoResponse = await self._get_folder_info(self._parsed.folder_key)
         folder: FolderInfo = action_response['folder_info']
         ftree_u: FileSystemMapping = await self._build_file_system(folder)
-        ftree: FileSystemMapping = {p: ftree_u[p] for p in sorted(ftree_u, key=lambda p: ftree_u[p]['created'])}
+        ftree: FileSystemMapping = {p: ftree_u[p] for p in sorted(ftree_u, key=lambda p: (ftree_u[p]['created'], p.split('/')))}
         files: FilePathMapping = {p: f for p, f in ftree.items() if 'filename' in f}
         Log.info(f'{folder["name"]}: found {len(files):d} files...')
 
@@ -294,36 +411,26 @@ class Mediafire:
         self._after_scan(folder, ftree)
 
         self._queue_size_orig = len(files)
-        proc_queue: set[pathlib.PurePosixPath] = self._filter_folder_files(files)
+        proc_queue: set[str] = await self._filter_folder_files(files)
         self._queue_size = len(proc_queue)
         Log.info(f'Saving {self._queue_size:d} / {len(files):d} files...')
 
-        async def download_folder_file_wrapper(index: int, file: FileInfo, file_path: pathlib.Path) -> pathlib.Path:
-            download_params = self._make_download_params(
-                index, file['num_in_queue'], file['links']['normal_download'], file_path, int(file['size']), file['hash'],
-            )
-            self._before_download(download_params)
-            async with semaphore:
-                return await self._download(download_params)
-
-        semaphore = Semaphore(self._max_jobs)
-        tasks = []
-        idx = 0
-        for path, file_or_folder in ftree.items():
-            if self._aborted:
-                return ()
-            if path not in proc_queue:
-                Log.trace(f'Skipping excluded node {file_or_folder!s} ({path})...')
-                continue
-            if int(file_or_folder['flag']) & FileFlags.VIRUS:
-                Log.warn(f'WARNING: file \'{pathlib.Path(path).relative_to(self._dest_base).as_posix()}\' was marked as VIRUS! SKIPPED!')
-                continue
-            tasks.append(create_task(download_folder_file_wrapper(idx, file_or_folder, pathlib.Path(path))))
-            idx += 1
+        def folder_download_params() -> Iterator[DownloadParams]:
+            idx = 0
+            for path, file_or_folder in ftree.items():
+                if path not in proc_queue:
+                    Log.trace(f'Skipping excluded node {file_or_folder!s} ({path})...')
+                    continue
+                if file_or_folder['flag'] & FileFlags.VIRUS:
+                    Log.warn(f'WARNING: file \'{pathlib.Path(path).relative_to(self._dest_base).as_posix()}\' was marked as VIRUS! SKIPPED!')
+                    continue
+                yield self._make_download_params(
+                    idx, file_or_folder['num_in_queue'], file_or_folder['links']['normal_download'], path,
+                    file_or_folder['size'], file_or_folder['hash'],
+                )
+                idx += 1
 
-        results: tuple[pathlib.Path | BaseException, ...] = await gather(*tasks)
-        Log.info(f'Downloaded {len([c for c in results if isinstance(c, pathlib.Path)])} / {len(tasks)} files')
-        return results
+        return await self._download_all(folder_download_params())
 
     async def download_url(self, url: str) -> tuple[pathlib.Path, ...]:
         """
@@ -350,7 +457,7 @@ class Mediafire:
         file: FileInfo = action_response['file_info']
         file_name = file['filename']
         file_url = file['links']['normal_download']
-        file_size = int(file['size'])
+        file_size = file['size']
         file_hash = file['hash']
 
         file['num_in_queue'] = 1
@@ -362,22 +469,23 @@ class Mediafire:
             Log.info(f'File {file_name} was filtered out by {ffilter!s}. Skipped!')
             return output_path
 
-        download_params = self._make_download_params(1, 1, file_url, output_path, file_size, file_hash)
+        download_params = self._make_download_params(1, 1, file_url, output_path.as_posix(), file_size, file_hash)
         self._before_download(download_params)
         return await self._download(download_params)
 
     async def _download(self, params: DownloadParams) -> pathlib.Path:
-        if self._download_mode == DownloadMode.SKIP:
-            return params.output_path
+        output_path = pathlib.Path(params.output_path)
+        if self._download_mode is DownloadMode.SKIP:
+            return output_path
         if self._aborted:
-            return params.output_path
+            return output_path
         num = params.num
         num_orig = params.num_orig
         file_url = params.file_url
-        output_path = params.output_path
         expected_size = params.expected_size
+        mem_mb = Mem.MB
 
-        touch = self._download_mode == DownloadMode.TOUCH
+        touch = self._download_mode is DownloadMode.TOUCH
 
         async def file_exists_exact(cur_size: int) -> Literal[1, 2, 3, 4]:
             if not (touch and cur_size == 0):
@@ -385,7 +493,7 @@ class Mediafire:
                     expected_hash = params.file_hash
                     existing_hash = hashlib.sha256()
                     async with async_open(output_path, 'rb') as infile_existing:
-                        async for hash_chunk in infile_existing.iter_chunked(4 * Mem.MB):
+                        async for hash_chunk in infile_existing.iter_chunked(DOWNLOAD_CHUNK_SIZE):
                             existing_hash.update(hash_chunk)
                     if existing_hash.hexdigest() == expected_hash:
                         return 1
@@ -393,9 +501,11 @@ class Mediafire:
                 return 3
             return 4
 
-        existing_size = output_path.stat().st_size if output_path.is_file() else 0
+        existing_size = regular_file_size(output_path)
 
-        file_exists_result = await file_exists_exact(existing_size)
+        file_exists_result = 4 if existing_size is None else await file_exists_exact(existing_size)
+        if self._noconfirm and file_exists_result == 1:
+            return output_path
 
         if file_exists_result in (1, 2, 3):
             if file_exists_result == 1:
@@ -404,24 +514,19 @@ class Mediafire:
                 size_match_msg = '(HASH MISMATCH!)'
             else:
                 size_match_msg = '(SIZE MISMATCH!)'
-            exists_msg = f'{output_path} already exists, size: {existing_size / Mem.MB:.2f} MB {size_match_msg}'
+            exists_msg = f'{output_path} already exists, size: {existing_size / mem_mb:.2f} MB {size_match_msg}'
             Log.info(exists_msg)
 
-            if self._noconfirm and file_exists_result == 1:
-                return output_path
-            ans = 'q'
-            while ans not in 'yYnN01':
-                ans = 'y' if self._noconfirm else input(f'{exists_msg}. Overwrite? [y/N]\n')
-                if ans in 'nN0':
+            if not self._noconfirm:
+                if not await self._confirm(f'{exists_msg}. Overwrite? [y/N]\n', False):
                     Log.warn(f'{output_path.name} was skipped')
                     return output_path
-                else:
-                    Log.warn(f'Overwriting {output_path.name}...')
+                Log.warn(f'Overwriting {output_path.name}...')
 
         touch_msg = ' <touch>' if touch else ''
         size_msg = '0.00 / ' if touch else ''
         Log.info(f'[{SITE_TAG}] [{num:d} / {self._queue_size:d}] ([{num_orig:d} / {self._queue_size_orig}])'
-                 f' Saving{touch_msg} {output_path.name} => {output_path} ({size_msg}{expected_size / Mem.MB:.2f} MB)...')
+                 f' Saving{touch_msg} {output_path.name} => {output_path} ({size_msg}{expected_size / mem_mb:.2f} MB)...')
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -430,46 +535,73 @@ class Mediafire:
             return output_path
 
         try_num = 0
-        while try_num <= self._retries:
-            if output_path.is_file() and await file_exists_exact(output_path.stat().st_size) == 1:
-                Log.info(f'{output_path} is already completed, size: {expected_size / Mem.MB:.2f}')
+        # counted separately: a successful transfer resets try_num but must not retry a corrupted file forever
+        hash_mismatches = 0
+        hash_ok = True
+        while try_num <= self._retries and hash_mismatches <= self._retries:
+            if (cur_size := regular_file_size(output_path)) is not None and await file_exists_exact(cur_size) == 1:
+                hash_ok = True
+                Log.info(f'{output_path} is already completed, size: {expected_size / mem_mb:.2f}')
                 break
             r: ClientResponse | None = None
             try:
-                async with await self._wrap_request('GET', file_url, headers={'Accept-Encoding': 'gzip'}) as r:
+                async with await self._wrap_request('GET', file_url) as r:
                     r.raise_for_status()
-                    content = await r.content.read()
                     if 'Content-Disposition' not in r.headers:
                         if (content_encoding := r.headers.get('Content-Encoding', '')) != 'gzip':
                             raise ValueError(f'Unexcepted content encoding \'{content_encoding}\'')
+                        content = b''
+                        while len(content) < INTERSTITIAL_READ_LIMIT:
+                            content_part = await r.content.read(INTERSTITIAL_READ_LIMIT - len(content))
+                            if not content_part:
+                                break
+                            content += content_part
                         # this can be either raw html or gzip file
                         try:
-                            with GzipFile(fileobj=BytesIO(content)) as gzip_file:
-                                content = gzip_file.read()
-                        except BadGzipFile:
+                            content = zlib.decompress(content, wbits=16 + zlib.MAX_WBITS)
+                        except zlib.error:
                             pass
-                        body = content.decode(UTF8)
-                        html = BeautifulSoup(body, 'html.parser')
-                        real_url = html.find('a', href=re.compile(r'https://download\d+\..+'))['href']
+                        if href_match := re_download_href.search(content):
+                            real_url = unescape(href_match.group(1).decode(UTF8))
+                        else:
+                            html = BeautifulSoup(content, 'html.parser')
+                            real_url = html.find('a', href=re_download_url)['href']
                         r.close()
                         r = await self._wrap_request('GET', real_url)
                         if r.content_length != expected_size:
                             Log.warn(f'Expected size mismatch at soup URL {real_url}: {r.content_length!s} != {expected_size:d}!')
 
                     bytes_written = 0
+                    next_log_bytes = mem_mb
                     i = 0
-                    async with async_open(output_path, 'wb') as output_file:
-                        async for chunk in r.content.iter_chunked(512 * Mem.KB):
-                            await output_file.write(chunk)
+                    download_hash = hashlib.sha256()
+                    hash_buffer = bytearray()
+                    async with AIOFile(output_path, 'wb') as output_file:
+                        async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                            # small chunks are buffered, full buffer is hashed in a worker thread while the chunk is being written
+                            hash_buffer += chunk
+                            if len(hash_buffer) >= DOWNLOAD_CHUNK_SIZE:
+                                await gather(output_file.write(chunk, bytes_written), to_thread(download_hash.update, hash_buffer))
+                                hash_buffer = bytearray()
+                            else:
+                                await output_file.write(chunk, bytes_written)
                             chunk_size = len(chunk)
                             bytes_written += chunk_size
                             i += 1
                             if try_num and chunk_size:
                                 try_num = 0
-                            if i % 100 == 1 or bytes_written + 1 * Mem.MB >= expected_size:
-                                dwn_progress_str = f'+{chunk_size:d} ({bytes_written / Mem.MB:.2f} / {expected_size / Mem.MB:.2f} MB)'
+                            # progress is reported each time written size doubles and at the very end
+                            if bytes_written >= next_log_bytes or bytes_written + mem_mb >= expected_size:
+                                while next_log_bytes <= bytes_written:
+                                    next_log_bytes *= 2
+                                dwn_progress_str = f'+{chunk_size:d} ({bytes_written / mem_mb:.2f} / {expected_size / mem_mb:.2f} MB)'
                                 Log.info(f'[{SITE_TAG}] [{num:d} / {self._queue_size:d}] {output_path.name}'
                                          f' chunk {i:d}: {dwn_progress_str}...')
+                    download_hash.update(hash_buffer)
+                    hash_ok = not params.file_hash or bytes_written != expected_size or download_hash.hexdigest() == params.file_hash
+                    if not hash_ok:
+                        hash_mismatches += 1
+                        raise ValueError(f'Hash mismatch: {download_hash.hexdigest()} != {params.file_hash}')
                 break
             except Exception as e:
                 Log.error(f'{output_path.name}: {sys.exc_info()[0]}: {sys.exc_info()[1]}')
@@ -478,92 +610,122 @@ class Mediafire:
                     Log.error(f'{output_path.name}: error #{try_num:d}...')
                 if r is not None and not r.closed:
                     r.close()
-                if try_num <= self._retries:
+                if try_num <= self._retries and hash_mismatches <= self._retries:
                     await sleep(random.uniform(*CONNECT_RETRY_DELAY))
 
-        if output_path.is_file():
-            total_size = output_path.stat().st_size
-            Log.info(f'{output_path.name} {"" if total_size == expected_size else "NOT "}completed ({total_size / Mem.MB:.2f} MB)')
+        if hash_ok and (total_size := regular_file_size(output_path)) is not None:
+            Log.info(f'{output_path.name} {"" if total_size == expected_size else "NOT "}completed ({total_size / mem_mb:.2f} MB)')
             return output_path
 
         Log.error(f'FAILED to download {output_path.name}!')
         return pathlib.Path()
 
-    def _filter_folder_files(self, ftree: dict[pathlib.PurePosixPath, FileInfo]) -> set[pathlib.PurePosixPath]:
-        proc_queue = set[pathlib.PurePosixPath]()
+    async def _filter_folder_files(self, ftree: FilePathMapping) -> set[str]:
+        proc_queue = set[str]()
         file_idx = 0
         enqueued_idx = 0
+        mem_mb = Mem.MB
         for qpath, file in ftree.items():
             if self._aborted:
                 break
             file_idx += 1
+            qname = qpath.rpartition('/')[2]
             if self._parsed.folder_key and self._parsed.file_key:
                 do_append = file['quickkey'] == self._parsed.file_key
                 if not do_append:
-                    Log.trace(f'[{file_idx:d}] File \'{qpath.name}\' is not selected for download, skipped...')
+                    Log.trace(f'[{file_idx:d}] File \'{qname}\' is not selected for download, skipped...')
                     continue
             elif self._filters:
                 if ffilter := any_filter_matching(file, self._filters):
-                    Log.info(f'[{file_idx:d}] File {qpath.name} was filtered out by {ffilter!s}. Skipped!')
+                    Log.info(f'[{file_idx:d}] File {qname} was filtered out by {ffilter!s}. Skipped!')
                     continue
                 do_append = True
             else:
-                file_size = int(file['size'])
-                ans = 'y' if self._noconfirm else 'q'
-                while ans not in 'nNyY10':
-                    ans = input(f'[{file_idx:d}] Download {qpath.name} ({file_size / Mem.MB:.2f} MB)? [Y/n]\n')
-                do_append = ans in 'yY1'
+                file_size = file['size']
+                do_append = self._noconfirm or await self._confirm(
+                    f'[{file_idx:d}] Download {qname} ({file_size / mem_mb:.2f} MB)? [Y/n]\n', True)
             if do_append:
                 enqueued_idx += 1
-                Log.info(f'[{enqueued_idx:d}] {qpath.name} enqueued...')
+                Log.info(f'[{enqueued_idx:d}] {qname} enqueued...')
                 proc_queue.add(qpath)
         return proc_queue
 
     async def _build_file_system(self, root_folder: FolderInfo) -> FileSystemMapping:
-        async def build_path_tree(parent_folder: FolderInfo, parent_folder_path: pathlib.PurePosixPath) -> None:
-            folder_key = parent_folder['folderkey']
-            if int(parent_folder.get('file_count', '0')) > 0:
-                files_response: APIFolderContentResponse = await self._get_folder_files(folder_key)
-                for file_info in files_response['folder_content'].get('files', []):
-                    file_path = parent_folder_path / file_info['filename'].strip()
-                    path_mapping[file_path] = file_info
-            if int(parent_folder.get('folder_count', '0')) > 0:
-                subfolders_response: APIFolderContentResponse = await self._get_folder_folders(folder_key)
-                for folder_info in subfolders_response['folder_content'].get('folders', []):
-                    folder_path = parent_folder_path / folder_info['name'].strip()
-                    path_mapping[folder_path] = folder_info
-                    await build_path_tree(folder_info, folder_path)
+        async def scan_folder(folder: FolderInfo) -> tuple[list[FileInfo], list[FolderInfo]]:
+            folder_key = folder['folderkey']
+            files: list[FileInfo] = []
+            subfolders: list[FolderInfo] = []
+            if (file_count := folder.get('file_count', 0)) > 0:
+                files_response: APIFolderContentResponse = await self._get_folder_files(folder_key, file_count)
+                files = files_response['folder_content'].get('files', [])
+            if (folder_count := folder.get('folder_count', 0)) > 0:
+                subfolders_response: APIFolderContentResponse = await self._get_folder_folders(folder_key, folder_count)
+                subfolders = subfolders_response['folder_content'].get('folders', [])
+            return files, subfolders
 
         root_name = root_folder['name']
-        root_path = pathlib.PurePosixPath(self._dest_base.joinpath(root_name.strip()))
+        root_path = self._dest_base.joinpath(root_name.strip()).as_posix()
         path_mapping: FileSystemMapping = {root_path: root_folder}
-        await build_path_tree(root_folder, root_path)
 
-        sorted_mapping: FileSystemMapping = {k: path_mapping[k] for k in sorted(path_mapping)}
-        return sorted_mapping
+        # breadth-first: all folders of the same depth level are scanned concurrently, API requests are limited in _query_api
+        level: list[tuple[FolderInfo, str]] = [(root_folder, root_path)]
+        while level:
+            scan_results = await gather(*(scan_folder(folder) for folder, _ in level))
+            next_level: list[tuple[FolderInfo, str]] = []
+            for (_, folder_path), (files, subfolders) in zip(level, scan_results, strict=True):
+                for file_info in files:
+                    file_path = f'{folder_path}/{file_info["filename"].strip()}'
+                    path_mapping[file_path] = file_info
+                for folder_info in subfolders:
+                    subfolder_path = f'{folder_path}/{folder_info["name"].strip()}'
+                    path_mapping[subfolder_path] = folder_info
+                    next_level.append((folder_info, subfolder_path))
+            level = next_level
+
+        return path_mapping
+
+    @staticmethod
+    def _normalize_fields(
+        info: FileInfo | FolderInfo | FolderContent, int_fields: tuple[str, ...], literal_fields: tuple[str, ...],
+    ) -> None:
+        for field in int_fields:
+            if field in info:
+                info[field] = int(info[field])
+        for field in literal_fields:
+            if field in info:
+                info[field] = sys.intern(info[field])
+
+    @staticmethod
+    def _normalize_response(jresp: APIResponse) -> APIResponse:
+        # numeric fields are converted once here so consumers can use them directly,
+        # fields with a handful of possible values share interned strings across all items
+        response = jresp['response']
+        if 'file_info' in response:
+            Mediafire._normalize_fields(response['file_info'], FILE_INFO_INT_FIELDS, FILE_INFO_LITERAL_FIELDS)
+        elif 'folder_info' in response:
+            Mediafire._normalize_fields(response['folder_info'], FOLDER_INFO_INT_FIELDS, FOLDER_INFO_LITERAL_FIELDS)
+        elif 'folder_content' in response:
+            content = response['folder_content']
+            Mediafire._normalize_fields(content, FOLDER_CONTENT_INT_FIELDS, FOLDER_CONTENT_LITERAL_FIELDS)
+            for file_info in content.get('files', []):
+                Mediafire._normalize_fields(file_info, FILE_INFO_INT_FIELDS, FILE_INFO_LITERAL_FIELDS)
+            for folder_info in content.get('folders', []):
+                Mediafire._normalize_fields(folder_info, FOLDER_INFO_INT_FIELDS, FOLDER_INFO_LITERAL_FIELDS)
+        return jresp
 
     @staticmethod
     def _parse_url(url: str) -> ParsedUrl:
-        folder_lookup1 = '/folder/'
-        file_lookup1, file_lookup2 = '/file/', '/file_premium/'
-        has_folder = folder_lookup1 in url
-        has_file1, has_file2 = file_lookup1 in url, file_lookup2 in url
-        folder_key = ''
-        file_key = ''
-        if has_folder:
-            # ex: {SITE}/folder/aoxkjmx3y/awesometitle/
-            parts = url.split(folder_lookup1, 1)[1]
-            folder_key, name = tuple(parts.split('/')[:2])
-        elif has_file1 or has_file2:
-            # ex. {SITE}/file/oxteykmx3y/fstaj.rar/file
-            url = url.replace(' ', '')
-            fmatch = re_mediafire_file.search(url)
-            assert fmatch, f'Unable to parse url v2: file id not found in \'{url}\'!'
-            parts = url.split(file_lookup1 if has_file1 else file_lookup2, 1)[1]
-            file_key, name = tuple(parts.split('/')[:2])
-        else:
+        # ex: {SITE}/folder/aoxkjmx3y/awesometitle/
+        # ex. {SITE}/file/oxteykmx3y/fstaj.rar/file
+        url = url.replace(' ', '')
+        url_match = re_mediafire_url.match(url)
+        if not url_match:
             raise ValueError(f'Not a valid Mediafire URL \'{url}\'!')
-        return ParsedUrl(folder_key, file_key, name)
+        url_type, key, name = url_match.groups()
+        if url_type == 'folder':
+            return ParsedUrl(key, '', name)
+        assert re_mediafire_file.search(url), f'Unable to parse url v2: file id not found in \'{url}\'!'
+        return ParsedUrl('', key, name)
 
 #
 #
@@ -8,7 +8,6 @@ Author: trickerer (https://github.com/trickerer, https://github.com/trickerer01)
 
 from __future__ import annotations
 
-import pathlib
 from enum import IntEnum
 from typing import Literal, NamedTuple, TypeAlias, TypedDict
 
@@ -49,16 +48,16 @@ class FileInfo(TypedDict):
     ready: Literal['yes', 'no']
     created: str  # date time
     description: str
-    size: str  # numeric
+    size: int
     privacy: Literal['public', 'private']
     password_protected: Literal['yes', 'no']
     hash: str  # sha256 hash (API 1.5)
     filetype: str  # Literal?
     mimetype: str  # 'application/x-rar'
     owner_name: str
-    flag: str  # numeric, see FileFlags
+    flag: int  # see FileFlags
     permissions: Permissions
-    revision: str  # numeric
+    revision: int
     view: str  # numeric
     edit: str  # numeric
     links: FileLinks
@@ -79,12 +78,12 @@ class FolderInfo(TypedDict):
     description: str
     created: str  # date time
     privacy: Literal['public', 'private']
-    file_count: str  # numeric
-    folder_count: str  # numeric
-    revision: str  # numeric
+    file_count: int
+    folder_count: int
+    revision: int
     owner_name: str  # unused
     avatar: str  # URL, unused
-    flag: str  # numeric, see FolderFlags
+    flag: int  # see FolderFlags
     permissions: Permissions
     created_utc: str  # ISO timestamp
 
@@ -95,14 +94,14 @@ class FolderFolderInfo(FolderInfo):
 
 
 class FolderContent(TypedDict):
-    chunk_size: str  # numeric
+    chunk_size: int
     content_type: Literal['files', 'folders']
-    chunk_number: str  # numeric
+    chunk_number: int
     folderkey: str
     files: list[FolderFileInfo]
     folders: list[FolderFolderInfo]
     more_chunks: Literal['yes', 'no']
-    revision: str  # numeric
+    revision: int
 
 
 class ActionResponse(TypedDict):
@@ -134,21 +133,24 @@ class ParsedUrl(NamedTuple):
 
     @staticmethod
     def default() -> ParsedUrl:
-        return ParsedUrl('', '', '')
+        return _PARSED_URL_DEFAULT
+
+
+_PARSED_URL_DEFAULT = ParsedUrl('', '', '')
 
 
 class DownloadParams(NamedTuple):
     num: int
     num_orig: int
     file_url: str
-    output_path: pathlib.Path
+    output_path: str  # posix path
     expected_size: int
     file_hash: str
 
 
-FileSystemMapping: TypeAlias = dict[pathlib.PurePosixPath, FileInfo | FolderInfo]
+FileSystemMapping: TypeAlias = dict[str, FileInfo | FolderInfo]
 '''Mapping: path -> FileInfo | FolderInfo'''
-FilePathMapping: TypeAlias = dict[pathlib.PurePosixPath, FileInfo]
+FilePathMapping: TypeAlias = dict[str, FileInfo]
 '''Mapping: path -> FileInfo'''
 
 #
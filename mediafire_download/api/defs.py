@@ -11,6 +11,9 @@ from typing import NamedTuple
 
 CONNECT_REQUEST_DELAY = 0.3
 CONNECT_RETRY_DELAY = (4.0, 8.0)
+CONNECT_LIMIT_TOTAL_DEFAULT = 0
+CONNECT_DNS_CACHE_TTL_DEFAULT = 300
+CONNECT_KEEPALIVE_TIMEOUT_DEFAULT = 60.0
 
 UTF8 = 'utf-8'
 HTTPS_PREFIX = 'https://'
@@ -19,6 +22,7 @@ SITE_TAG = 'MediaFire'
 SITE_PRIMARY = f'{HTTPS_PREFIX}www.mediafire.com'
 SITE_API = f'{SITE_PRIMARY}/api'
 API_VERSION = '1.5'
+API_FOLDER_CACHE_SIZE = 256
 
 
 class DownloadMode(str, Enum):
@@ -39,12 +43,16 @@ class Mem:
     GB = MB * 1024
 
 
+INTERSTITIAL_READ_LIMIT = 512 * Mem.KB
+DOWNLOAD_CHUNK_SIZE = 4 * Mem.MB
+
+
 class NumRange(NamedTuple):
     min: float
     max: float
 
     def __bool__(self) -> bool:
-        return any(bool(getattr(self, _)) for _ in self._fields)
+        return bool(self.min) or bool(self.max)
 
 #
 #
@@ -31,6 +31,10 @@ MEDIAFIRE_ERROR_DESCRIPTION: dict[MediafireErrorCodes, tuple[str, str]] = {
     MediafireErrorCodes.MEDIAFIRE_ERROR_CODE_GENERIC: ('EGENERIC', 'Unknown error \'%d\''),
 }
 
+MEDIAFIRE_ERROR_MESSAGES: dict[MediafireErrorCodes, str] = {
+    code: f'{err_name}, {err_desc}' for code, (err_name, err_desc) in MEDIAFIRE_ERROR_DESCRIPTION.items() if '%' not in err_desc
+}
+
 
 class MediafireError(Exception):
     """Generic mediafire error"""
@@ -42,15 +46,12 @@ class ValidationError(MediafireError):
 
 class RequestError(MediafireError):
     def __init__(self, msg_or_code: str | int | MediafireErrorCodes) -> None:
-        if isinstance(msg_or_code, (int, MediafireErrorCodes)):
+        if isinstance(msg_or_code, int):  # includes MediafireErrorCodes
             self.code = msg_or_code
-            if self.code in MEDIAFIRE_ERROR_DESCRIPTION:
-                err_name, err_desc = MEDIAFIRE_ERROR_DESCRIPTION[self.code]
-            else:
-                err = MEDIAFIRE_ERROR_DESCRIPTION[MediafireErrorCodes.MEDIAFIRE_ERROR_CODE_GENERIC]
-                err_name = err[0]
-                err_desc = err[1] % (self.code if isinstance(self.code, int) else self.code.value)
-            self.message = f'{err_name}, {err_desc}'
+            if (message := MEDIAFIRE_ERROR_MESSAGES.get(self.code)) is None:
+                err_name, err_desc = MEDIAFIRE_ERROR_DESCRIPTION[MediafireErrorCodes.MEDIAFIRE_ERROR_CODE_GENERIC]
+                message = f'{err_name}, {err_desc % int(self.code)}'
+            self.message = message
         else:
             self.code = MediafireErrorCodes.MEDIAFIRE_ERROR_CODE_GENERIC
             self.message = str(msg_or_code)
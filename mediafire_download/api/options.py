@@ -17,7 +17,15 @@ from .filters import Filter
 from .logging import Logger
 
 
-class MediafireOptions(TypedDict):
+class _MediafireConnectionOptions(TypedDict, total=False):
+    # optional (NotRequired requires Python 3.11)
+    connection_limit: int  # 0 for no limit, default is CONNECT_LIMIT_TOTAL_DEFAULT
+    connection_limit_per_host: int  # 0 for no limit, default is max_jobs
+    dns_cache_ttl: int  # seconds, default is CONNECT_DNS_CACHE_TTL_DEFAULT
+    keepalive_timeout: float  # seconds, default is CONNECT_KEEPALIVE_TIMEOUT_DEFAULT
+
+
+class MediafireOptions(_MediafireConnectionOptions):
     # for local
     dest_base: pathlib.Path
     retries: int
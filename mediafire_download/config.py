@@ -11,7 +11,7 @@ from typing import Protocol
 
 from aiohttp import ClientTimeout
 
-from .defs import NumRange
+from .api import NumRange
 
 __all__ = ('BaseConfigContainer', 'Config')
 
@@ -7,7 +7,6 @@ Author: trickerer (https://github.com/trickerer, https://github.com/trickerer01)
 #
 
 from enum import IntEnum
-from typing import NamedTuple
 
 MIN_PYTHON_VERSION = (3, 10)
 MIN_PYTHON_VERSION_STR = f'{MIN_PYTHON_VERSION[0]:d}.{MIN_PYTHON_VERSION[1]:d}'
@@ -75,14 +74,6 @@ HELP_ARG_FILTERS = 'Available filters: file number is queue (order is always the
 HELP_ARG_DUMP_LINKS = 'Store all gathered links and other misc info for future processing'
 HELP_ARG_DUMP_STRUCTURE = 'Store target url filesystem structure'
 
-
-class NumRange(NamedTuple):
-    min: float
-    max: float
-
-    def __bool__(self) -> bool:
-        return any(bool(getattr(self, _)) for _ in self._fields)
-
 #
 #
 #########################################
@@ -9,7 +9,7 @@ Author: trickerer (https://github.com/trickerer, https://github.com/trickerer01)
 from typing import Final
 
 from .api import FileInfo, Mem, NumRange
-from .util import build_regex_from_pattern
+from .util import build_matcher_from_pattern, build_regex_from_pattern
 
 
 class FileNumFilter:
@@ -37,8 +37,7 @@ class FileSizeFilter:
         self._range = irange
 
     def filters_out(self, file: FileInfo) -> bool:
-        file_size = int(file['size'])
-        file_size /= FileSizeFilter.resolution
+        file_size = file['size'] / FileSizeFilter.resolution
         return not self._range.min <= file_size <= self._range.max
 
     def __str__(self) -> str:
@@ -50,14 +49,15 @@ class FileNameFilter:
     Filters files by file name pattern (regex)
     """
     def __init__(self, pattern: str) -> None:
-        self._regex = build_regex_from_pattern(pattern)
+        self._pattern = pattern
+        self._matches = build_matcher_from_pattern(pattern)
 
     def filters_out(self, file: FileInfo) -> bool:
         file_name = file['filename']
-        return self._regex.fullmatch(file_name) is None
+        return not self._matches(file_name)
 
     def __str__(self) -> str:
-        return f'{self.__class__.__name__}<{self._regex.pattern!s}>'
+        return f'{self.__class__.__name__}<{build_regex_from_pattern(self._pattern).pattern!s}>'
 
 
 class FileExtFilter:
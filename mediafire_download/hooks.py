@@ -66,7 +66,7 @@ class DumpLinksCallback(DownloadParamsCallback):
             download_params.num,
             download_params.num_orig,
             download_params.file_url,
-            download_params.output_path.relative_to(Config.dest_base),
+            pathlib.Path(download_params.output_path).relative_to(Config.dest_base).as_posix(),
             download_params.expected_size,
             download_params.file_hash,
         ))
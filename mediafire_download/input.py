@@ -6,7 +6,7 @@ Author: trickerer (https://github.com/trickerer, https://github.com/trickerer01)
 # Original solution by Bharel: https://stackoverflow.com/a/70664652
 #
 
-from asyncio import CancelledError, sleep
+from asyncio import CancelledError, Lock, sleep
 from collections.abc import Callable
 from contextlib import contextmanager, nullcontext
 from platform import system
@@ -42,24 +42,29 @@ else:
     next_input = functools.partial(sys.stdin.read, 1)
 
 
-async def wait_for_key(key: str, count: int, callback: Callable[[], None]) -> None:
+async def wait_for_key(key: str, count: int, callback: Callable[[], None], input_lock: Lock) -> None:
     try:
         stroke_sequence: list[str] = []
-        with set_terminal_raw():
-            while stroke_sequence != [key] * count:
-                await sleep(1.0)
-                if not input_ready():
-                    stroke_sequence.clear()
-                    continue
-                while input_ready():
-                    ch = next_input()
-                    if ch == key:
-                        stroke_sequence.append(ch)
-                    else:
+        while stroke_sequence != [key] * count:
+            await sleep(1.0)
+            # a prompt is reading stdin, skip this poll
+            if input_lock.locked():
+                continue
+            # terminal is only kept raw while polling so a pending prompt can take over stdin between polls
+            async with input_lock:
+                with set_terminal_raw():
+                    if not input_ready():
                         stroke_sequence.clear()
-                        while input_ready():
-                            next_input()
-            callback()
+                        continue
+                    while input_ready():
+                        ch = next_input()
+                        if ch == key:
+                            stroke_sequence.append(ch)
+                        else:
+                            stroke_sequence.clear()
+                            while input_ready():
+                                next_input()
+        callback()
     except CancelledError:
         pass
 
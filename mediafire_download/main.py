@@ -111,7 +111,8 @@ class MediafireDownloader:
             return []
         before_download_callbacks, after_scan_callbacks = create_callbacks()
         mediafire = Mediafire(make_mediafire_options(before_download_callbacks, after_scan_callbacks))
-        abort_waiter = get_running_loop().create_task(wait_for_key(SCAN_CANCEL_KEYSTROKE, SCAN_CANCEL_KEYCOUNT, mediafire.abort))
+        abort_waiter = get_running_loop().create_task(
+            wait_for_key(SCAN_CANCEL_KEYSTROKE, SCAN_CANCEL_KEYCOUNT, mediafire.abort, mediafire.prompt_lock))
 
         async with AsyncExitStack() as ctx:
             await ctx.enter_async_context(mediafire)
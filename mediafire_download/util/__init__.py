@@ -1,6 +1,6 @@
 from .containers import assert_nonempty
-from .filesystem import extract_ext, normalize_filename, normalize_path, sanitize_filename
-from .strings import build_regex_from_pattern, compose_link_v15
+from .filesystem import extract_ext, normalize_filename, normalize_path, regular_file_size, sanitize_filename
+from .strings import build_matcher_from_pattern, build_regex_from_pattern, compose_link_v15
 from .time import (
     calculate_eta,
     datetime_str_nfull,
@@ -17,6 +17,7 @@ from .useragent import UAManager
 __all__ = (
     'UAManager',
     'assert_nonempty',
+    'build_matcher_from_pattern',
     'build_regex_from_pattern',
     'calculate_eta',
     'compose_link_v15',
@@ -30,6 +31,7 @@ __all__ = (
     'get_time_seconds',
     'normalize_filename',
     'normalize_path',
+    'regular_file_size',
     'sanitize_filename',
     'time_now_fmt',
 )
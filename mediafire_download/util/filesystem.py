@@ -6,7 +6,9 @@ Author: trickerer (https://github.com/trickerer, https://github.com/trickerer01)
 #
 #
 
+import os
 import re
+import stat
 from typing import Final
 
 SLASH = '/'
@@ -40,6 +42,15 @@ def normalize_filename(filename: str, base_path: str) -> str:
     return f'{normalize_path(base_path)}{sanitize_filename(filename)}'
 
 
+def regular_file_size(path: str | os.PathLike) -> int | None:
+    """Returns size of a regular file in bytes or **None** if it doesn't exist, using a single stat() call"""
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
 def extract_ext(href: str) -> str:
     ext_match = re_ext.search(href)
     return ext_match.group(1) if ext_match else ''
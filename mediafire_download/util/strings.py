@@ -6,13 +6,28 @@ Author: trickerer (https://github.com/trickerer, https://github.com/trickerer01)
 #
 #
 
+import functools
 import re
+from collections.abc import Callable
 
 HTTP_PREFIX = 'http://'
 HTTPS_PREFIX = 'https://'
 SITE_PRIMARY = f'{HTTPS_PREFIX}www.mediafire.com'
 SITE_API = f'{SITE_PRIMARY}/api'
 
+PAT_ESCAPE_CHAR = '`'
+PAT_ESCAPABLE: tuple[str, ...] = ('(?:', '?', '*', '(', ')', '.', ',', '+', '-')
+PAT_TRANSLATIONS: dict[str, str] = (
+    {f'{PAT_ESCAPE_CHAR}{k}': '(?:' if k == '(' else k for k in PAT_ESCAPABLE}
+    | {c: f'\\{c}' for c in PAT_ESCAPABLE if len(c) == 1 and c not in '?*'}
+    | {PAT_ESCAPE_CHAR: '', '*': '.*', '?': '.'}
+)
+
+PAT_NON_LITERAL_CHARS = f'*?{PAT_ESCAPE_CHAR}[]{{}}|^$\\'
+
+re_pattern_token = re.compile('|'.join(re.escape(_) for _ in sorted(PAT_TRANSLATIONS, key=len, reverse=True)))
+re_pattern_non_literal = re.compile(f'[{re.escape(PAT_NON_LITERAL_CHARS)}]')
+
 
 def compose_link_v15(folder_key: str, file_key: str, name: str) -> str:
     if name and (folder_key or file_key):
@@ -27,28 +42,31 @@ def compose_link_v15(folder_key: str, file_key: str, name: str) -> str:
     return ''
 
 
+def _translate_pattern_token(token: re.Match[str]) -> str:
+    return PAT_TRANSLATIONS[token.group()]
+
+
+@functools.lru_cache(maxsize=256)
 def build_regex_from_pattern(expression: str) -> re.Pattern:
-    pat_freplacements = {
-        '(?:': '\u2044', '?': '\u203D', '*': '\u20F0', '(': '\u2039', ')': '\u203A',
-        '.': '\u1FBE', ',': '\u201A', '+': '\u2020', '-': '\u2012',
-    }
-    pat_breplacements: dict[str, str] = {pat_freplacements[k]: k for k in pat_freplacements}
-    pat_breplacements[pat_freplacements['(']] = '(?:'
-    chars_need_escaping = list(pat_freplacements.keys())
-    del chars_need_escaping[1:3]
-    escape_char = '`'
-    escape = escape_char in expression
-    if escape:
-        for fk, wtag_freplacement in pat_freplacements.items():
-            expression = expression.replace(f'{escape_char}{fk}', wtag_freplacement)
-    for c in chars_need_escaping:
-        expression = expression.replace(c, f'\\{c}')
-    expression = expression.replace('*', '.*').replace('?', '.').replace(escape_char, '')
-    if escape:
-        for bk, pat_breplacement in pat_breplacements.items():
-            expression = expression.replace(f'{bk}', pat_breplacement)
+    expression = re_pattern_token.sub(_translate_pattern_token, expression)
     return re.compile(rf'^{expression}$')
 
+
+@functools.lru_cache(maxsize=256)
+def build_matcher_from_pattern(expression: str) -> Callable[[str], bool]:
+    body = expression.strip('*')
+    if re_pattern_non_literal.search(body):
+        regex = build_regex_from_pattern(expression)
+        return lambda s: regex.fullmatch(s) is not None
+    # literal text with optional leading and/or trailing wildcards, no regex needed
+    if expression.startswith('*'):
+        if expression.endswith('*'):
+            return lambda s: body in s
+        return lambda s: s.endswith(body)
+    if expression.endswith('*'):
+        return lambda s: s.startswith(body)
+    return lambda s: s == body
+
 #
 #
 #########################################
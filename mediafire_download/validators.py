@@ -13,12 +13,12 @@ from ipaddress import IPv4Address
 
 from aiohttp import ClientTimeout
 
+from .api import NumRange
 from .defs import (
     CONNECT_TIMEOUT_BASE,
     CONNECT_TIMEOUT_SOCKET_READ,
     LOGGING_FLAGS,
     MAX_JOBS_MAX,
-    NumRange,
 )
 from .logger import Log
 from .util import build_regex_from_pattern
@@ -7,12 +7,27 @@ Author: trickerer (https://github.com/trickerer, https://github.com/trickerer01)
 #
 
 import functools
+import hashlib
+import json
+import pathlib
+import sys
+import tempfile
+import time
+from asyncio import Lock, create_task, run, sleep
 from collections.abc import Callable
+from contextlib import nullcontext
 from unittest import TestCase
+from unittest.mock import patch
 
-from mediafire_download.api import RequestQueue
+from aiohttp import ClientTimeout
+
+from mediafire_download.api import DownloadMode, DownloadParams, Mediafire, MediafireOptions, RequestQueue
+from mediafire_download.api.containers import ParsedUrl
+from mediafire_download.api.exceptions import MediafireErrorCodes, RequestError
 from mediafire_download.config import Config
+from mediafire_download.input import wait_for_key
 from mediafire_download.logger import Log
+from mediafire_download.util import build_matcher_from_pattern, build_regex_from_pattern, regular_file_size
 
 RUN_CONN_TESTS = 0
 
@@ -31,12 +46,253 @@ def test_prepare(log=False) -> Callable[[], Callable[[], None]]:
     return invoke1
 
 
+def make_mediafire(max_jobs: int = 2) -> Mediafire:
+    return Mediafire(MediafireOptions(
+        dest_base=pathlib.Path.cwd(), retries=0, max_jobs=max_jobs, timeout=ClientTimeout(), nodelay=True, noconfirm=True, proxy='',
+        extra_headers=[], extra_cookies=[], filters=(), hooks_before_download=(), hooks_after_scan=(), download_mode=DownloadMode.FULL,
+        logger=Log,
+    ))
+
+
 class CmdTests(TestCase):
     @test_prepare()
     def test_config_integrity(self):
         assert all(hasattr(Config, _) for _ in Config.NAMESPACE_VARS_REMAP.values())
         print(f'{self._testMethodName} passed')
 
+
+class UtilTests(TestCase):
+    @test_prepare()
+    def test_build_regex_from_pattern(self):
+        assert build_regex_from_pattern('*.rar').pattern == r'^.*\.rar$'
+        assert build_regex_from_pattern('file?.bin').pattern == r'^file.\.bin$'
+        assert build_regex_from_pattern('a-b,c+d(e)').pattern == r'^a\-b\,c\+d\(e\)$'
+        assert build_regex_from_pattern('a`(b|c`)d').pattern == r'^a(?:b|c)d$'
+        assert build_regex_from_pattern('a`*').pattern == r'^a*$'
+        assert build_regex_from_pattern('a`?b`.c`+`-').pattern == r'^a?b.c+-$'
+        assert build_regex_from_pattern('*.rar') is build_regex_from_pattern('*.rar')
+        print(f'{self._testMethodName} passed')
+
+    @test_prepare()
+    def test_build_matcher_from_pattern(self):
+        def check(pattern: str, matching: tuple[str, ...], non_matching: tuple[str, ...]) -> None:
+            matches = build_matcher_from_pattern(pattern)
+            regex = build_regex_from_pattern(pattern)
+            for name in matching:
+                assert matches(name), f'\'{pattern}\' must match \'{name}\''
+                assert regex.fullmatch(name), f'\'{regex.pattern}\' must match \'{name}\''
+            for name in non_matching:
+                assert not matches(name), f'\'{pattern}\' must not match \'{name}\''
+                assert not regex.fullmatch(name), f'\'{regex.pattern}\' must not match \'{name}\''
+        # literal fast paths
+        check('*.rar', ('a.rar', '.rar', 'x.part1.rar'), ('a.rarx', 'arar', 'a.zip'))
+        check('part*', ('part', 'part1.rar'), ('apart', 'par'))
+        check('*mid*', ('mid', 'amidb', 'a.mid'), ('mi', 'm-i-d'))
+        check('file(1).zip', ('file(1).zip',), ('file1.zip', 'file(1)xzip', 'afile(1).zip'))
+        check('**a+b**', ('a+b', 'xa+bx'), ('ab', 'aab'))
+        check('', ('',), ('a',))
+        check('*', ('', 'anything'), ())
+        # escaped tokens and wildcards inside the pattern
+        check('a`(b|c`)d', ('abd', 'acd'), ('ad', 'a(b|c)d'))
+        check('a`*', ('', 'a', 'aaa'), ('a*', 'b'))
+        check('file?.bin', ('file1.bin', 'filex.bin'), ('file.bin', 'file12.bin'))
+        check('*a*b*', ('ab', 'xaybz'), ('ba',))
+        # regex metacharacters passed through
+        check('[ab]*.txt', ('a.txt', 'bxy.txt'), ('c.txt', 'a.txtx'))
+        check('^x$', ('x',), ('^x$',))
+        check('x{2}', ('xx',), ('x{2}', 'x'))
+        check('a\\d', ('a1',), ('a\\d', 'ad'))
+        print(f'{self._testMethodName} passed')
+
+    @test_prepare()
+    def test_regular_file_size(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            dir_path = pathlib.Path(tempdir)
+            file_path = dir_path / 'file.bin'
+            file_path.write_bytes(b'\0' * 1234)
+            assert regular_file_size(file_path) == 1234
+            assert regular_file_size(str(file_path)) == 1234
+            (dir_path / 'empty.bin').touch()
+            assert regular_file_size(dir_path / 'empty.bin') == 0
+            assert regular_file_size(dir_path) is None
+            assert regular_file_size(dir_path / 'missing.bin') is None
+            assert regular_file_size(file_path / 'child.bin') is None
+        print(f'{self._testMethodName} passed')
+
+
+class ApiTests(TestCase):
+    @test_prepare()
+    def test_parse_url(self):
+        parse_url = Mediafire._parse_url
+        assert parse_url('https://www.mediafire.com/folder/aoxkjmx3y/awesometitle') == ParsedUrl('aoxkjmx3y', '', 'awesometitle')
+        assert parse_url('https://www.mediafire.com/folder/aoxkjmx3y/awesometitle/') == ParsedUrl('aoxkjmx3y', '', 'awesometitle')
+        assert parse_url('https://www.mediafire.com/file/oxteykmx3y7rlpd/fstaj.rar/file') == ParsedUrl('', 'oxteykmx3y7rlpd', 'fstaj.rar')
+        premium_url = 'https://www.mediafire.com/file_premium/oxteykmx3y7rlpd/fstaj.rar/file'
+        assert parse_url(premium_url) == ParsedUrl('', 'oxteykmx3y7rlpd', 'fstaj.rar')
+        assert parse_url(' https://www.mediafire.com/file/oxteykmx3y7rlpd/fs taj.rar/file') == ParsedUrl('', 'oxteykmx3y7rlpd', 'fstaj.rar')
+        for bad_url in ('https://www.mediafire.com/', 'https://www.mediafire.com/folder/aoxkjmx3y', 'https://example.com/view/abc/def'):
+            try:
+                parse_url(bad_url)
+                assert False, f'\'{bad_url}\' must not be parsed'
+            except ValueError:
+                pass
+        try:
+            parse_url('https://www.mediafire.com/file/short/fstaj.rar/file')
+            assert False, 'file key shorter than 14 characters must be rejected'
+        except AssertionError as e:
+            assert 'file id not found' in str(e)
+        print(f'{self._testMethodName} passed')
+
+
+    @test_prepare()
+    def test_wrap_chunked_api_folder_query(self):
+        total_count, chunk_size = 10, 3
+        files = [{'filename': f'{i:d}.bin'} for i in range(total_count)]
+
+        async def query_folder_info(content_type: str, folder_key: str, get_content: bool, chunk_num: int) -> dict:
+            queried_chunks.append(chunk_num)
+            if (chunk_num - 1) * chunk_size >= total_count:
+                return {'response': {'action': 'folder/get_content', 'result': 'Error', 'error': 110, 'message': 'Unknown chunk'}}
+            return {'response': {'action': 'folder/get_content', 'result': 'Success', 'folder_content': {
+                'chunk_size': chunk_size, 'content_type': content_type, 'chunk_number': chunk_num,
+                'more_chunks': 'yes' if chunk_num * chunk_size < total_count else 'no',
+                content_type: files[(chunk_num - 1) * chunk_size:chunk_num * chunk_size],
+            }}}
+
+        for items_count in (total_count, 1, total_count * 5):
+            queried_chunks: list[int] = []
+            mediafire = make_mediafire(max_jobs=8)
+            with patch.object(mediafire, '_query_folder_info', query_folder_info):
+                result = run(mediafire._wrap_chunked_api_folder_query('files', 'aoxkjmx3y', items_count))
+            assert result['folder_content']['files'] == files, f'items count {items_count:d}: {result["folder_content"]["files"]!s}'
+            assert result['folder_content']['more_chunks'] == 'no'
+            assert set(range(1, 5)).issubset(queried_chunks)
+        print(f'{self._testMethodName} passed')
+
+    @test_prepare()
+    def test_download_hash_check(self):
+        class FakeContent:
+            async def iter_chunked(self, _: int):
+                for i in range(0, len(data), 64 * 1024):
+                    yield data[i:i + 64 * 1024]
+
+        class FakeResponse:
+            headers = {'Content-Disposition': 'attachment'}
+            content = FakeContent()
+            status = 200
+            closed = False
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *_) -> None:
+                pass
+
+            def raise_for_status(self) -> None:
+                pass
+
+            def close(self) -> None:
+                pass
+
+        async def wrap_request(*_) -> FakeResponse:
+            return FakeResponse()
+
+        data = bytes(range(256)) * (6 * 4096 + 1)
+        with tempfile.TemporaryDirectory() as tempdir:
+            output_path = pathlib.Path(tempdir) / 'file.bin'
+            for file_hash, expected_result in ((hashlib.sha256(data).hexdigest(), output_path), ('0' * 64, pathlib.Path())):
+                output_path.unlink(missing_ok=True)
+                mediafire = make_mediafire()
+                params = DownloadParams(1, 1, 'https://download1.mediafire.com/file.bin', output_path.as_posix(), len(data), file_hash)
+                with patch.object(mediafire, '_wrap_request', wrap_request):
+                    assert run(mediafire._download(params)) == expected_result, f'hash \'{file_hash}\''
+                assert output_path.read_bytes() == data
+        print(f'{self._testMethodName} passed')
+
+    @test_prepare()
+    def test_parse_file(self):
+        dict_entries = [
+            {'num': 1, 'num_orig': 1, 'file_url': 'https://www.mediafire.com/file/a', 'output_path': 'dir/a.bin', 'expected_size': 10,
+             'file_hash': 'aa'},
+            {'num': 2, 'num_orig': 3, 'file_url': 'https://www.mediafire.com/file/b', 'output_path': 'dir/b.bin', 'expected_size': 20,
+             'file_hash': 'bb'},
+        ]
+        list_entries = [[3, 4, 'https://www.mediafire.com/file/c', 'c.bin', 30, 'cc']]
+        links = {
+            'dicts': dict_entries, 'lists': list_entries, 'empty': [], 'name': 'links', 'bad_dicts': [{'num': 5}], 'bad_lists': [[5, 6]],
+        }
+        dest_base = pathlib.Path.cwd()
+        with tempfile.TemporaryDirectory() as tempdir:
+            links_file = pathlib.Path(tempdir) / 'links.json'
+            links_file.write_text(json.dumps(links))
+            download_params = make_mediafire()._parse_file(links_file)
+        assert download_params == [
+            DownloadParams(1, 1, 'https://www.mediafire.com/file/a', (dest_base / 'dir/a.bin').as_posix(), 10, 'aa'),
+            DownloadParams(2, 3, 'https://www.mediafire.com/file/b', (dest_base / 'dir/b.bin').as_posix(), 20, 'bb'),
+            DownloadParams(3, 4, 'https://www.mediafire.com/file/c', (dest_base / 'c.bin').as_posix(), 30, 'cc'),
+        ]
+        print(f'{self._testMethodName} passed')
+
+    @test_prepare()
+    def test_normalize_response_int_fields(self):
+        folder_content = {
+            'chunk_size': '100', 'content_type': 'files', 'chunk_number': '1', 'more_chunks': 'no', 'revision': '7',
+            'files': [{'quickkey': 'oxteykmx3y7rlpd', 'filename': 'a.bin', 'size': '1234', 'flag': '4', 'revision': '2'}],
+            'folders': [{'folderkey': 'aoxkjmx3y', 'name': 'sub', 'file_count': '3', 'folder_count': '0', 'flag': '2', 'revision': '5'}],
+        }
+        content = Mediafire._normalize_response({'response': {'folder_content': folder_content}})['response']['folder_content']
+        assert (content['chunk_size'], content['chunk_number'], content['revision']) == (100, 1, 7)
+        assert (content['files'][0]['size'], content['files'][0]['flag'], content['files'][0]['revision']) == (1234, 4, 2)
+        assert content['folders'][0]['file_count'] == 3 and content['folders'][0]['folder_count'] == 0
+        assert content['files'][0]['filename'] == 'a.bin'
+        file_info = Mediafire._normalize_response({'response': {'file_info': {'filename': 'a.bin', 'size': '1234'}}})['response']['file_info']
+        assert file_info == {'filename': 'a.bin', 'size': 1234}
+        print(f'{self._testMethodName} passed')
+
+    @test_prepare()
+    def test_normalize_response_interned_fields(self):
+        def fresh(value: str) -> str:
+            # equal but distinct string object, as produced by the JSON decoder
+            return ''.join(list(value))
+        files = [{'filename': f'{i:d}.bin', 'privacy': fresh('public'), 'ready': fresh('yes')} for i in range(3)]
+        folder_content = {'content_type': fresh('files'), 'more_chunks': fresh('no'), 'files': files}
+        assert files[0]['privacy'] is not files[1]['privacy']
+        content = Mediafire._normalize_response({'response': {'folder_content': folder_content}})['response']['folder_content']
+        assert content['content_type'] is sys.intern('files') and content['more_chunks'] is sys.intern('no')
+        assert all(f['privacy'] is sys.intern('public') and f['ready'] is sys.intern('yes') for f in content['files'])
+        assert all(f['filename'] == f'{i:d}.bin' for i, f in enumerate(content['files']))
+        print(f'{self._testMethodName} passed')
+
+    @test_prepare()
+    def test_request_error_message(self):
+        assert str(RequestError(MediafireErrorCodes.ESESSIONTOKEN)) == 'ESESSIONTOKEN, No session token was provided'
+        assert str(RequestError(MediafireErrorCodes.EUNKNOWNRESPONSE)) == 'EUNKNOWNRESPONSE, API response is not recognized'
+        assert RequestError(MediafireErrorCodes.ESESSIONTOKEN).code == MediafireErrorCodes.ESESSIONTOKEN
+        assert str(RequestError(7)) == 'EGENERIC, Unknown error \'7\''
+        assert str(RequestError(MediafireErrorCodes.MEDIAFIRE_ERROR_CODE_GENERIC)) == 'EGENERIC, Unknown error \'-255\''
+        error = RequestError('Custom message')
+        assert str(error) == 'Custom message' and error.code == MediafireErrorCodes.MEDIAFIRE_ERROR_CODE_GENERIC
+        print(f'{self._testMethodName} passed')
+
+class InputTests(TestCase):
+    @test_prepare()
+    def test_wait_for_key_does_not_delay_prompts(self):
+        async def prompt_many(count: int) -> float:
+            input_lock = Lock()
+            watcher = create_task(wait_for_key('q', 3, lambda: None, input_lock))
+            await sleep(0)
+            start = time.perf_counter()
+            for _ in range(count):
+                async with input_lock:
+                    await sleep(0)
+            elapsed = time.perf_counter() - start
+            watcher.cancel()
+            await watcher
+            return elapsed
+        with patch('mediafire_download.input.set_terminal_raw', nullcontext), patch('mediafire_download.input.input_ready', lambda: False):
+            assert run(prompt_many(5)) < 0.5
+        print(f'{self._testMethodName} passed')
+
 #
 #
 #########################################